@@ -4,21 +4,90 @@
 # v1.5.0
 
 import os
+import re
+import sys
 import time
+import queue
+import heapq
+import atexit
 import shutil
+import functools
 import signal
 import hashlib
 import errno
 import random
 import argparse
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, Set, Dict
+from collections import OrderedDict, deque, namedtuple
 from pathlib import Path
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
+
+if os.name == 'nt':
+    import msvcrt
+    import ctypes
+    fcntl = None
+    # Bound once with proper signatures: resolving through ctypes.windll
+    # per call re-runs the attribute lookup and argument guessing each time.
+    _GetFileAttributesW = ctypes.windll.kernel32.GetFileAttributesW
+    _GetFileAttributesW.argtypes = [ctypes.c_wchar_p]
+    _GetFileAttributesW.restype = ctypes.c_uint32
+else:
+    import fcntl
+    msvcrt = None
+    _GetFileAttributesW = None
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+import _wsq
+
+# Optional io_uring copy acceleration (Linux + `pip install liburing`).
+try:
+    import _uring
+except Exception:
+    _uring = None
+
+# Optional SIMD hashing (`pip install blake3`); falls back to OpenSSL SHA-256,
+# which uses the CPU's SHA extensions where present. Both are far faster than
+# the old MD5 loop on big videos; the digest is only used for dedup, never
+# shown to the user, so the algorithm is free to change.
+try:
+    import blake3
+except Exception:
+    blake3 = None
+
+# Metadata libraries are hoisted here so the hot extractors stop paying the
+# per-call `import` lookup, and HEIF support registers exactly once.
+try:
+    import piexif
+except Exception:
+    piexif = None
+try:
+    import exifread
+except Exception:
+    exifread = None
+try:
+    import ffmpeg
+except Exception:
+    ffmpeg = None
+try:
+    from PIL import Image
+except Exception:
+    Image = None
+try:
+    import pillow_heif
+    pillow_heif.register_heif_opener()
+except Exception:
+    pillow_heif = None
+
+# piexif IFD ids in probe order, computed once for the exifread-less fallback.
+_DT_TAG_IDS = () if piexif is None else (
+    piexif.ExifIFD.DateTimeOriginal,
+    piexif.ExifIFD.DateTimeDigitized,
+    piexif.ImageIFD.DateTime,
+)
+
 # ------------------ Defaults / Config ------------------
 DEFAULT_WATCH_DIR = Path(r"C:\uploads")
 DEFAULT_PHOTOS_ROOT = Path(r"J:\Photos")
@@ -30,27 +99,59 @@ MAX_PROCESSING_HISTORY = 1000
 COPY_BUFFER_SIZE = 8 * 1024 * 1024  # 8 MB buffer by default for big files
 RETRY_ATTEMPTS = 8
 
-ALLOWED_EXT = {
+ALLOWED_EXT = frozenset({
     '.jpg', '.jpeg', '.png', '.cr2', '.cr3', '.nef', '.arw',
     '.mp4', '.mov', '.avi', '.mkv', '.mts', '.m2ts',
     '.webp', '.heic', '.heif',
     '.raf', '.orf', '.rw2', '.dng', '.sr2', '.gif', '.bmp', '.tiff'
-}
+})
 
-IGNORE_DIRS = {'.hist', '.tmp', 'temp', 'tmp', 'cache', 'thumbnail', 'thumb'}
+# Defined up here because the duplicate-trash directory must be part of the
+# ignore set: its files live under WATCH_DIR, and the rename into it fires a
+# watch event that would otherwise re-import every trashed duplicate.
+TRASH_DIR_NAME = ".duplicates"
+
+IGNORE_DIRS = frozenset({'.hist', '.tmp', 'temp', 'tmp', 'cache', 'thumbnail',
+                         'thumb', TRASH_DIR_NAME})
 IGNORE_PREFIXES = ('.', '~', 'Thumbs.db')
-IGNORE_EXT = {'.tmp', '.temp', '.crdownload', '.part', '.lnk'}
+IGNORE_EXT = frozenset({'.tmp', '.temp', '.crdownload', '.part', '.lnk'})
+
+# Precompiled ignore matcher: the whole name-based decision — ignored
+# directory segments, temp/partial extensions, dot/tilde/Thumbs.db basenames
+# — compiled into one regex, so should_ignore is a single C-level scan over
+# the path string instead of four Python-level branches per file.
+_IGNORE_RE = re.compile(
+    r'(?i)(?:^|[\\/])(?:' + '|'.join(re.escape(d) for d in sorted(IGNORE_DIRS)) + r')(?:[\\/]|$)'
+    r'|(?:' + '|'.join(re.escape(e) for e in sorted(IGNORE_EXT)) + r')$'
+    r'|(?:^|[\\/])(?:' + '|'.join(re.escape(p) for p in IGNORE_PREFIXES) + r')[^\\/]*$')
 
 # ------------------ Globals (initialized in main) ------------------
 WATCH_DIR: Path = DEFAULT_WATCH_DIR
 PHOTOS_ROOT: Path = DEFAULT_PHOTOS_ROOT
 LOGFILE: Path = DEFAULT_LOGFILE
 DRY_RUN = False
+VERBOSE = False
 CHECKSUM_ON_DUP = True
-
-PROCESSING_FILES: Set[str] = set()
-FILE_HISTORY: Dict[str, float] = {}
-LOCK = threading.Lock()
+# "trash": confirmed duplicates are renamed into WATCH_DIR/.duplicates
+# (one O(1) rename, reversible after a false positive); "delete" unlinks
+# them immediately as before.
+DUP_MODE = "trash"
+TRASH_MAX_AGE_DAYS = 30
+
+# In-flight claims live in one plain dict: setdefault is a single C-level
+# operation under the GIL, so claiming a key is lock-free. Recently-processed
+# history stays sharded by key hash across 16 buckets so workers touching
+# different files never contend on the same lock; each shard is
+# insertion-ordered and evicts via popitem(last=False), O(1) per entry.
+_INFLIGHT: Dict[str, float] = {}
+_SHARD_COUNT = 16
+
+class _Shards:
+    locks = [threading.Lock() for _ in range(_SHARD_COUNT)]
+    hist: "list[OrderedDict[str, float]]" = [OrderedDict() for _ in range(_SHARD_COUNT)]
+
+def _bucket(key: str) -> int:
+    return hash(key) & (_SHARD_COUNT - 1)
 STOP_EVENT = threading.Event()
 
 # ------------------ Styled logging helpers ------------------
@@ -87,61 +188,69 @@ class LogArt:
         }
         return emoji_map.get(extension.lower(), '📄')
 
+# Style templates are built once at import: picking one is an index + a
+# single `%` format instead of constructing a list of f-strings and calling
+# random.choice per log line (the DEBUG copy-progress stream is hot).
+_LR = random.Random()
+
+_SUCCESS_T = (
+    f"{Color.GREEN}✓ %s{Color.END}",
+    f"{Color.GREEN}✅ %s{Color.END}",
+    f"{Color.GREEN}✨ %s{Color.END}",
+    f"{Color.GREEN}🌟 %s{Color.END}",
+    f"{Color.BOLD}{Color.GREEN}➤ %s{Color.END}",
+)
+_INFO_T = (
+    f"{Color.CYAN}ℹ %s{Color.END}",
+    f"{Color.BLUE}📘 %s{Color.END}",
+    f"{Color.DARKCYAN}▪ %s{Color.END}",
+    f"{Color.CYAN}➤ %s{Color.END}",
+)
+_WARNING_T = (
+    f"{Color.YELLOW}⚠ %s{Color.END}",
+    f"{Color.ORANGE}⚠️ %s{Color.END}",
+    f"{Color.YELLOW}⚠️  %s{Color.END}",
+)
+_ERROR_T = (
+    f"{Color.RED}✗ %s{Color.END}",
+    f"{Color.RED}❌ %s{Color.END}",
+    f"{Color.RED}💥 %s{Color.END}",
+    f"{Color.BOLD}{Color.RED}⚠ %s{Color.END}",
+)
+_DEBUG_T = (
+    f"{Color.GRAY}⚙ %s{Color.END}",
+    f"{Color.GRAY}🔧 %s{Color.END}",
+    f"{Color.GRAY}🌀 %s{Color.END}",
+)
+_PROCESSING_T = tuple(
+    f"{Color.PURPLE}{anim} %s{Color.END}"
+    for anim in ('⣾', '⣽', '⣻', '⢿', '⡿', '⣟', '⣯', '⣷')
+)
+
 class LogStyle:
     @staticmethod
     def success(msg: str) -> str:
-        styles = [
-            f"{Color.GREEN}✓ {msg}{Color.END}",
-            f"{Color.GREEN}✅ {msg}{Color.END}",
-            f"{Color.GREEN}✨ {msg}{Color.END}",
-            f"{Color.GREEN}🌟 {msg}{Color.END}",
-            f"{Color.BOLD}{Color.GREEN}➤ {msg}{Color.END}"
-        ]
-        return random.choice(styles)
+        return _SUCCESS_T[_LR.getrandbits(4) % len(_SUCCESS_T)] % msg
 
     @staticmethod
     def info(msg: str) -> str:
-        styles = [
-            f"{Color.CYAN}ℹ {msg}{Color.END}",
-            f"{Color.BLUE}📘 {msg}{Color.END}",
-            f"{Color.DARKCYAN}▪ {msg}{Color.END}",
-            f"{Color.CYAN}➤ {msg}{Color.END}"
-        ]
-        return random.choice(styles)
+        return _INFO_T[_LR.getrandbits(2)] % msg
 
     @staticmethod
     def warning(msg: str) -> str:
-        styles = [
-            f"{Color.YELLOW}⚠ {msg}{Color.END}",
-            f"{Color.ORANGE}⚠️ {msg}{Color.END}",
-            f"{Color.YELLOW}⚠️  {msg}{Color.END}",
-        ]
-        return random.choice(styles)
+        return _WARNING_T[_LR.getrandbits(4) % len(_WARNING_T)] % msg
 
     @staticmethod
     def error(msg: str) -> str:
-        styles = [
-            f"{Color.RED}✗ {msg}{Color.END}",
-            f"{Color.RED}❌ {msg}{Color.END}",
-            f"{Color.RED}💥 {msg}{Color.END}",
-            f"{Color.BOLD}{Color.RED}⚠ {msg}{Color.END}"
-        ]
-        return random.choice(styles)
+        return _ERROR_T[_LR.getrandbits(2)] % msg
 
     @staticmethod
     def debug(msg: str) -> str:
-        styles = [
-            f"{Color.GRAY}⚙ {msg}{Color.END}",
-            f"{Color.GRAY}🔧 {msg}{Color.END}",
-            f"{Color.GRAY}🌀 {msg}{Color.END}"
-        ]
-        return random.choice(styles)
+        return _DEBUG_T[_LR.getrandbits(4) % len(_DEBUG_T)] % msg
 
     @staticmethod
     def processing(msg: str) -> str:
-        animations = ['⣾', '⣽', '⣻', '⢿', '⡿', '⣟', '⣯', '⣷']
-        anim = random.choice(animations)
-        return f"{Color.PURPLE}{anim} {msg}{Color.END}"
+        return _PROCESSING_T[_LR.getrandbits(3)] % msg
 
     @staticmethod
     def header(msg: str) -> str:
@@ -208,35 +317,103 @@ class Statistics:
 
 STATS = Statistics()
 
-# Low-level file write for logs to avoid recursion
+# Low-level file write for logs to avoid recursion.
+# Messages go through a bounded queue to one daemon writer thread that keeps
+# the log open and drains batches with writelines() — instead of an
+# open/write/close syscall triple per line from every worker.
+_LOG_Q: "queue.Queue[str]" = queue.Queue(maxsize=10000)
+
+def _log_writer():
+    fh = None
+    fh_path = None
+    while True:
+        msgs = [_LOG_Q.get()]
+        try:
+            while len(msgs) < 256:
+                msgs.append(_LOG_Q.get_nowait())
+        except queue.Empty:
+            pass
+        try:
+            # LOGFILE can be reassigned by main() after arg parsing;
+            # reopen when that happens.
+            if fh is None or fh_path != LOGFILE:
+                if fh is not None:
+                    fh.close()
+                fh = open(LOGFILE, "a", buffering=1 << 16, encoding="utf-8")
+                fh_path = LOGFILE
+            fh.writelines(m + "\n" for m in msgs)
+            fh.flush()
+        except Exception as e:
+            fh = None
+            print(f"{Color.RED}⚠ Не могу записать в лог-файл: {e}{Color.END}")
+
+threading.Thread(target=_log_writer, daemon=True, name="log-writer").start()
+
+def _drain_log_queue():
+    # Give the writer a moment to flush what's queued before the process dies.
+    deadline = time.time() + 2.0
+    while not _LOG_Q.empty() and time.time() < deadline:
+        time.sleep(0.05)
+
+atexit.register(_drain_log_queue)
+
 def _write_log_file(file_msg: str):
     try:
-        with open(LOGFILE, "a", encoding="utf-8") as f:
-            f.write(file_msg + "\n")
-    except Exception as e:
-        print(f"{Color.RED}⚠ Не могу записать в лог-файл: {e}{Color.END}")
+        _LOG_Q.put_nowait(file_msg)
+    except queue.Full:
+        # Writer has fallen badly behind; take the slow direct path rather
+        # than dropping the message.
+        try:
+            with open(LOGFILE, "a", encoding="utf-8") as f:
+                f.write(file_msg + "\n")
+        except Exception as e:
+            print(f"{Color.RED}⚠ Не могу записать в лог-файл: {e}{Color.END}")
+
+_STYLE_FN = {
+    "SUCCESS": LogStyle.success,
+    "INFO": LogStyle.info,
+    "WARN": LogStyle.warning,
+    "ERROR": LogStyle.error,
+    "DEBUG": LogStyle.debug,
+    "PROCESSING": LogStyle.processing,
+}
+
+# When stdout is piped (systemd, cron, > file) the ANSI decoration is just
+# noise and allocation work — emit plain lines instead.
+_STYLED_CONSOLE = sys.stdout.isatty()
+
+# Timestamps are only second-resolution anyway, so format them once per
+# second instead of two datetime.now()+strftime round-trips per log line.
+_TS_CACHE = [0, '', '']
+
+def _now_strs():
+    sec = int(time.time())
+    if sec != _TS_CACHE[0]:
+        lt = time.localtime(sec)
+        _TS_CACHE[0] = sec
+        _TS_CACHE[1] = time.strftime("%H:%M:%S", lt)
+        _TS_CACHE[2] = time.strftime("%Y-%m-%dT%H:%M:%S", lt)
+    return _TS_CACHE[1], _TS_CACHE[2]
 
 def log(msg: str, level: str = "INFO", show_emoji: bool = True, dont_repeat_stats: bool = False):
     """Safe logging without recursive calls."""
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    emoji = LogArt.get_random_emoji() if show_emoji else ""
-
-    if level == "SUCCESS":
-        console_msg = f"{Color.GRAY}[{timestamp}]{Color.END} {LogStyle.success(msg)}"
-    elif level == "INFO":
-        console_msg = f"{Color.GRAY}[{timestamp}]{Color.END} {LogStyle.info(msg)}"
-    elif level == "WARN":
-        console_msg = f"{Color.GRAY}[{timestamp}]{Color.END} {LogStyle.warning(msg)}"
-    elif level == "ERROR":
-        console_msg = f"{Color.GRAY}[{timestamp}]{Color.END} {LogStyle.error(msg)}"
-    elif level == "DEBUG":
-        console_msg = f"{Color.GRAY}[{timestamp}]{Color.END} {LogStyle.debug(msg)}"
-    elif level == "PROCESSING":
-        console_msg = f"{Color.GRAY}[{timestamp}]{Color.END} {LogStyle.processing(msg)}"
+    # DEBUG is chatty per-file noise; skip all formatting and queueing
+    # unless the user asked for it.
+    if level == "DEBUG" and not VERBOSE:
+        return
+    timestamp, iso_ts = _now_strs()
+
+    if not _STYLED_CONSOLE:
+        console_msg = f"[{timestamp}] [{level}] {msg}"
     else:
-        console_msg = f"{Color.GRAY}[{timestamp}]{Color.END} {emoji} {msg}"
+        style_fn = _STYLE_FN.get(level)
+        if style_fn is not None:
+            console_msg = f"{Color.GRAY}[{timestamp}]{Color.END} {style_fn(msg)}"
+        else:
+            emoji = LogArt.get_random_emoji() if show_emoji else ""
+            console_msg = f"{Color.GRAY}[{timestamp}]{Color.END} {emoji} {msg}"
 
-    file_msg = f"[{datetime.now().isoformat()}] [{level}] {msg}"
+    file_msg = f"[{iso_ts}] [{level}] {msg}"
     _write_log_file(file_msg)
     print(console_msg)
 
@@ -245,10 +422,10 @@ def log(msg: str, level: str = "INFO", show_emoji: bool = True, dont_repeat_stat
         if random.random() < 0.3:
             summary_msg = f"Обработано уже {STATS.files_processed} файлов! {LogArt.get_random_emoji()}"
             # console
-            timestamp2 = datetime.now().strftime("%H:%M:%S")
+            timestamp2 = timestamp
             print(f"{Color.GRAY}[{timestamp2}]{Color.END} {LogStyle.info(summary_msg)}")
             # file
-            _write_log_file(f"[{datetime.now().isoformat()}] [INFO] {summary_msg}")
+            _write_log_file(f"[{iso_ts}] [INFO] {summary_msg}")
 
 def log_banner():
     banners = [
@@ -269,21 +446,32 @@ def log_banner():
     print(random.choice(banners))
     print(f"{Color.GRAY}{'='*50}{Color.END}\n")
 
+# Like the LogStyle templates: message flavors are %-templates chosen by
+# index, not lists of f-strings rebuilt per file.
+_DISCOVERY_T = (
+    "🔍 Обнаружено %d файлов для обработки",
+    "📂 Найдено %d файлов в очереди",
+    "🎯 Целей для сортировки: %d",
+)
+_PROCESSING_MSG_T = (
+    f"%s Начинаю обработку: {Color.CYAN}%s{Color.END}",
+    f"%s Анализирую файл: {Color.BLUE}%s{Color.END}",
+    f"%s В работе: {Color.PURPLE}%s{Color.END}",
+)
+_DUPLICATE_T = (
+    f"🔄 Дубликат обнаружен, удаляю: {Color.YELLOW}%s{Color.END}",
+    f"⚡ Файл уже существует, пропускаю: {Color.GRAY}%s{Color.END}",
+)
+_FILE_ERROR_T = (
+    "💥 Ошибка при обработке %s: %s",
+    "⚠️ Сбой в работе с %s: %s",
+)
+
 def log_file_discovery(count: int):
-    messages = [
-        f"🔍 Обнаружено {count} файлов для обработки",
-        f"📂 Найдено {count} файлов в очереди",
-        f"🎯 Целей для сортировки: {count}"
-    ]
-    log(random.choice(messages), "INFO")
+    log(_DISCOVERY_T[_LR.getrandbits(4) % len(_DISCOVERY_T)] % count, "INFO")
 
 def log_file_processing(filename: str, emoji: str = "📄"):
-    messages = [
-        f"{emoji} Начинаю обработку: {Color.CYAN}{filename}{Color.END}",
-        f"{emoji} Анализирую файл: {Color.BLUE}{filename}{Color.END}",
-        f"{emoji} В работе: {Color.PURPLE}{filename}{Color.END}"
-    ]
-    log(random.choice(messages), "PROCESSING")
+    log(_PROCESSING_MSG_T[_LR.getrandbits(4) % len(_PROCESSING_MSG_T)] % (emoji, filename), "PROCESSING")
 
 def log_file_moved(source: str, destination: str, file_emoji: str):
     src_short = Path(source).name
@@ -298,18 +486,10 @@ def log_file_moved(source: str, destination: str, file_emoji: str):
     log(random.choice(styles), "SUCCESS")
 
 def log_duplicate_found(filename: str):
-    messages = [
-        f"🔄 Дубликат обнаружен, удаляю: {Color.YELLOW}{filename}{Color.END}",
-        f"⚡ Файл уже существует, пропускаю: {Color.GRAY}{filename}{Color.END}"
-    ]
-    log(random.choice(messages), "WARN")
+    log(_DUPLICATE_T[_LR.getrandbits(1)] % filename, "WARN")
 
 def log_error(filename: str, error: str):
-    messages = [
-        f"💥 Ошибка при обработке {filename}: {error}",
-        f"⚠️ Сбой в работе с {filename}: {error}"
-    ]
-    log(random.choice(messages), "ERROR")
+    log(_FILE_ERROR_T[_LR.getrandbits(1)] % (filename, error), "ERROR")
 
 def log_progress(current: int, total: int):
     if total > 0:
@@ -324,12 +504,76 @@ def log_progress(current: int, total: int):
 
 # ------------------ File stability & metadata ------------------
 
+# On Linux the inotify backend delivers IN_CLOSE_WRITE (watchdog's on_closed)
+# the moment the uploader finishes writing — record those so is_file_stable
+# can skip the stat/open polling loop entirely for live uploads. Bounded LRU;
+# entries are consumed by the stability check.
+_CLOSED_LOCK = threading.Lock()
+_CLOSED_FILES: "OrderedDict[str, float]" = OrderedDict()
+
+def _signal_closed(file_key: str):
+    with _CLOSED_LOCK:
+        _CLOSED_FILES[file_key] = time.time()
+        _CLOSED_FILES.move_to_end(file_key)
+        while len(_CLOSED_FILES) > 2048:
+            _CLOSED_FILES.popitem(last=False)
+
+def _consume_closed(file_key: str) -> bool:
+    with _CLOSED_LOCK:
+        return _CLOSED_FILES.pop(file_key, None) is not None
+
+def _win_writer_done(filepath: Path) -> Optional[bool]:
+    """
+    Windows: one CreateFileW probe with no sharing — succeeds only when no
+    other process holds the file open. Returns None when the probe itself
+    is unavailable so the caller falls back to polling.
+    """
+    if os.name != 'nt':
+        return None
+    try:
+        import ctypes
+        GENERIC_READ = 0x80000000
+        OPEN_EXISTING = 3
+        handle = ctypes.windll.kernel32.CreateFileW(
+            str(filepath), GENERIC_READ, 0, None, OPEN_EXISTING, 0, None)
+        if handle in (-1, ctypes.c_void_p(-1).value):
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    except Exception as e:
+        log(f"Exclusive-open probe failed for {filepath}: {e}", "DEBUG")
+        return None
+
+def _writer_lock_free(filepath: Path) -> bool:
+    """
+    Non-blocking shared-lock probe: True when no writer currently holds a
+    lock on the file. Never blocks; any failure counts as "maybe locked".
+    """
+    try:
+        fd = os.open(str(filepath), os.O_RDONLY)
+    except OSError:
+        return False
+    try:
+        if msvcrt is not None:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        return True
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+
 def is_file_stable(filepath: Path, min_stable_seconds: float = 2.0, max_wait_seconds: float = 1800.0) -> bool:
     """
     Adaptive stability check for large files.
-    Waits until file size doesn't change for `adaptive_stable` seconds,
-    but not longer than max_wait_seconds.
-    Also tries to open file in append mode to detect locks on Windows.
+    Fast paths: a recorded close-write event (Linux/inotify) or a successful
+    exclusive-open probe (Windows) prove the writer is done without polling.
+    Otherwise polls size+mtime with exponential backoff; an unchanged sample
+    confirmed by a non-blocking lock probe returns early, while a file that
+    keeps changing is given up on after max_wait_seconds.
     """
     try:
         if not filepath.exists():
@@ -339,51 +583,50 @@ def is_file_stable(filepath: Path, min_stable_seconds: float = 2.0, max_wait_sec
         if total_size == 0:
             return False
 
+        # Fast path: uploader already closed the file after writing.
+        if _consume_closed(str(filepath)):
+            log(f"File closed by writer (close-write event): {filepath.name}", "DEBUG")
+            return True
+        if _win_writer_done(filepath) is True:
+            log(f"File not locked by any writer: {filepath.name}", "DEBUG")
+            return True
+
         size_mb = max(1.0, total_size / (1024.0 * 1024.0))
         adaptive_stable = min(max(min_stable_seconds, 0.2 * size_mb), 60.0)
         adaptive_max_wait = min(max_wait_seconds, max(60.0, size_mb * 2))
 
+        # Poll with exponential backoff (50 ms, 100 ms, ... capped at 1 s)
+        # sampling size + mtime_ns. Half a second of unchanged samples plus a
+        # successful non-blocking lock probe short-circuits the full adaptive
+        # quiet window (up to 60 s for large files), without trusting the
+        # probe alone against writers that pause between chunks.
         start = time.time()
-        last_size = total_size
+        last = (total_size, filepath.stat().st_mtime_ns)
         stable_since = None
+        step = 0
 
         while True:
+            time.sleep(min(0.05 * (1 << step), 1.0))
+            step += 1
             try:
-                # Try opening file for append; if file still being written, many writers will block this.
-                with open(filepath, "ab"):
-                    pass
-            except Exception:
-                stable_since = None
-                log(f"File appears locked (in use): {filepath}", "DEBUG")
-                time.sleep(0.5)
-                if time.time() - start > adaptive_max_wait:
-                    log(f"Timeout waiting for unlocked file: {filepath}", "WARN")
-                    return False
-                continue
-
-            try:
-                cur_size = filepath.stat().st_size
+                st = filepath.stat()
             except Exception as e:
                 log(f"Cannot stat file during stability check {filepath}: {e}", "DEBUG")
                 return False
 
-            if cur_size != last_size:
-                last_size = cur_size
+            now = time.time()
+            cur = (st.st_size, st.st_mtime_ns)
+            if cur == last and st.st_size > 0:
+                if stable_since is None:
+                    stable_since = now
+                quiet = now - stable_since
+                if quiet >= adaptive_stable or (quiet >= 0.5 and _writer_lock_free(filepath)):
+                    return True
+            else:
+                last = cur
                 stable_since = None
-                time.sleep(0.5)
-                if time.time() - start > adaptive_max_wait:
-                    log(f"Timeout waiting for file growth to finish: {filepath}", "WARN")
-                    return False
-                continue
-
-            if stable_since is None:
-                stable_since = time.time()
 
-            if time.time() - stable_since >= adaptive_stable:
-                return cur_size > 0
-
-            time.sleep(0.5)
-            if time.time() - start > adaptive_max_wait:
+            if now - start > adaptive_max_wait:
                 log(f"Timeout waiting for stable file: {filepath}", "WARN")
                 return False
 
@@ -391,72 +634,165 @@ def is_file_stable(filepath: Path, min_stable_seconds: float = 2.0, max_wait_sec
         log(f"Cannot check file stability {filepath}: {e}", "WARN")
         return False
 
-def get_exif_datetime(filepath: Path) -> Optional[datetime]:
+def _parse_exif_ts(s: str) -> Optional[datetime]:
+    """
+    Fixed-layout "YYYY:MM:DD HH:MM:SS" parse by slicing: the field offsets
+    are constant, so int() on six slices replaces the locale-aware
+    regex-backed strptime (the separator character is never looked at, so
+    the dash variant parses identically). strptime stays as the fallback
+    for anything malformed.
+    """
     try:
-        ext = filepath.suffix.lower()
-        if ext in ['.heic', '.heif']:
+        return datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]),
+                        int(s[11:13]), int(s[14:16]), int(s[17:19]))
+    except Exception:
+        for fmt in ("%Y:%m:%d %H:%M:%S", "%Y-%m-%d %H:%M:%S"):
             try:
-                from PIL import Image
-                import pillow_heif
-                pillow_heif.register_heif_opener()
-                with Image.open(filepath) as img:
-                    exif = img.getexif()
-                    if exif:
-                        from PIL.ExifTags import TAGS
-                        for tag_id, value in exif.items():
-                            tag_name = TAGS.get(tag_id, tag_id)
-                            if tag_name in ['DateTimeOriginal', 'DateTimeDigitized', 'DateTime'] and value:
-                                try:
-                                    return datetime.strptime(value, "%Y:%m:%d %H:%M:%S")
-                                except Exception:
-                                    continue
-            except ImportError:
-                log("pillow-heif not installed (optional)", "WARN")
-            except Exception as e:
-                log(f"Cannot read HEIC metadata {filepath}: {e}", "DEBUG")
-            return None
+                return datetime.strptime(s, fmt)
+            except ValueError:
+                continue
+    return None
+
+def _exifread_datetime(f) -> Optional[datetime]:
+    """Pull the first usable datetime tag out of an already-open file."""
+    if exifread is None:
+        return None
+    tags = exifread.process_file(f, stop_tag="EXIF DateTimeOriginal", details=False)
+    for tag in ("EXIF DateTimeOriginal", "EXIF DateTimeDigitized", "Image DateTime"):
+        dt_str = str(tags.get(tag, ''))
+        if dt_str and dt_str != 'None':
+            dt = _parse_exif_ts(dt_str)
+            if dt is not None:
+                return dt
+    return None
+
+# Pillow getexif tag ids probed directly (no TAGS name translation):
+# DateTimeOriginal, DateTimeDigitized, Image DateTime.
+_HEIC_DT_IDS = (0x9003, 0x9004, 0x0132)
+
+def _heic_datetime(filepath: Path, fsrc=None) -> Optional[datetime]:
+    if Image is None or pillow_heif is None:
+        log("pillow-heif not installed (optional)", "WARN")
+        return None
+    try:
+        if fsrc is not None:
+            fsrc.seek(0)
+        with Image.open(fsrc if fsrc is not None else filepath) as img:
+            exif = img.getexif()
+            if exif:
+                for tag_id in _HEIC_DT_IDS:
+                    value = exif.get(tag_id)
+                    if value:
+                        dt = _parse_exif_ts(str(value))
+                        if dt is not None:
+                            return dt
+    except Exception as e:
+        log(f"Cannot read HEIC metadata {filepath}: {e}", "DEBUG")
+    return None
+
+def get_image_datetime(filepath: Path, fsrc=None) -> Optional[datetime]:
+    """
+    One extractor for every still format. exifread stops parsing at the
+    datetime tags and never decodes thumbnails/maker notes, so JPEG and RAW
+    share the same cheap single-probe path; HEIC goes through pillow-heif.
+    piexif remains only as a fallback for when exifread is absent.
+    """
+    try:
+        if filepath.suffix.lower() in ('.heic', '.heif'):
+            return _heic_datetime(filepath, fsrc)
 
-        import piexif
+        if exifread is not None:
+            if fsrc is not None:
+                fsrc.seek(0)
+                return _exifread_datetime(fsrc)
+            with open(filepath, 'rb') as f:
+                return _exifread_datetime(f)
+
+        if piexif is None:
+            return None
         exif_dict = piexif.load(str(filepath))
-        dt_tags = [
-            (piexif.ExifIFD.DateTimeOriginal, "DateTimeOriginal"),
-            (piexif.ExifIFD.DateTimeDigitized, "DateTimeDigitized"),
-            (piexif.ImageIFD.DateTime, "DateTime")
-        ]
-        for tag_id, tag_name in dt_tags:
-            dt = exif_dict.get("Exif", {}).get(tag_id)
-            if dt:
-                try:
-                    return datetime.strptime(dt.decode("utf-8"), "%Y:%m:%d %H:%M:%S")
-                except Exception:
-                    continue
+        for tag_id in _DT_TAG_IDS:
+            raw = exif_dict.get("Exif", {}).get(tag_id)
+            if raw:
+                dt = _parse_exif_ts(raw.decode("utf-8", "replace"))
+                if dt is not None:
+                    return dt
         return None
     except Exception as e:
-        log(f"Cannot read EXIF from {filepath}: {e}", "DEBUG")
+        log(f"Cannot read image metadata from {filepath}: {e}", "DEBUG")
         return None
 
-def get_raw_datetime(filepath: Path) -> Optional[datetime]:
-    try:
-        import exifread
-        with open(filepath, 'rb') as f:
-            tags = exifread.process_file(f, stop_tag="EXIF DateTimeOriginal", details=False)
-            dt_tags = ["EXIF DateTimeOriginal", "EXIF DateTimeDigitized", "Image DateTime"]
-            for tag in dt_tags:
-                dt_str = str(tags.get(tag, ''))
-                if dt_str and dt_str != 'None':
-                    for fmt in ["%Y:%m:%d %H:%M:%S", "%Y-%m-%d %H:%M:%S"]:
-                        try:
-                            return datetime.strptime(dt_str, fmt)
-                        except ValueError:
-                            continue
+# QuickTime/MP4 timestamps count seconds from 1904-01-01.
+_MP4_EPOCH = datetime(1904, 1, 1)
+
+def _mvhd_datetime(filepath: Path, fsrc=None) -> Optional[datetime]:
+    """
+    Read creation_time straight out of the mp4/mov mvhd atom: a few KB of
+    box headers instead of forking ffprobe (~50 ms per file on the initial
+    scan). Returns None on anything unexpected so the caller can fall back.
+    """
+    f = fsrc if fsrc is not None else open(filepath, 'rb')
+    try:
+        f.seek(0, 2)
+        file_end = f.tell()
+
+        def boxes(start, stop):
+            off = start
+            while off + 8 <= stop:
+                f.seek(off)
+                hdr = f.read(8)
+                if len(hdr) < 8:
+                    return
+                size = int.from_bytes(hdr[:4], 'big')
+                payload = off + 8
+                if size == 1:  # 64-bit largesize follows the type
+                    size = int.from_bytes(f.read(8), 'big')
+                    payload = off + 16
+                elif size == 0:  # box extends to end of enclosing scope
+                    size = stop - off
+                if size < 8:
+                    return
+                yield hdr[4:8], payload, off + size
+                off += size
+
+        for typ, payload, box_end in boxes(0, file_end):
+            if typ != b'moov':
+                continue
+            for typ2, payload2, _ in boxes(payload, box_end):
+                if typ2 != b'mvhd':
+                    continue
+                f.seek(payload2)
+                version = f.read(1)[0]
+                f.seek(payload2 + 4)  # skip flags
+                width = 8 if version == 1 else 4
+                ct = int.from_bytes(f.read(width), 'big')
+                # 0 means "not set"; also reject times before Unix epoch,
+                # which are invariably mastering-tool garbage.
+                if ct > 2082844800:
+                    return _MP4_EPOCH + timedelta(seconds=ct)
+                return None
+            return None
         return None
     except Exception as e:
-        log(f"Cannot read RAW metadata from {filepath}: {e}", "DEBUG")
+        log(f"Cannot parse mvhd atom from {filepath}: {e}", "DEBUG")
         return None
+    finally:
+        if fsrc is None:
+            try:
+                f.close()
+            except Exception:
+                pass
 
-def get_video_datetime(filepath: Path) -> Optional[datetime]:
+def get_video_datetime(filepath: Path, fsrc=None) -> Optional[datetime]:
     try:
-        import ffmpeg
+        # mp4/mov family: creation time is a fixed field we can read
+        # in-process; everything else (and parse failures) forks ffprobe.
+        if filepath.suffix.lower() in ('.mp4', '.mov'):
+            dt = _mvhd_datetime(filepath, fsrc)
+            if dt is not None:
+                return dt
+        if ffmpeg is None:
+            return None
         probe = ffmpeg.probe(str(filepath))
         creation_time = None
         if "format" in probe and "tags" in probe["format"]:
@@ -484,6 +820,15 @@ def get_video_datetime(filepath: Path) -> Optional[datetime]:
         log(f"Cannot read video metadata from {filepath}: {e}", "DEBUG")
         return None
 
+# Extension -> metadata extractor, computed once at import; replaces the
+# chain of set-literal membership tests in the resolve stage. All extractors
+# share the (filepath, fsrc) signature.
+_DT_DISPATCH = {e: get_image_datetime for e in (
+    '.jpg', '.jpeg', '.png', '.webp', '.heic', '.heif', '.gif', '.bmp', '.tiff',
+    '.cr2', '.cr3', '.nef', '.arw', '.raf', '.orf', '.rw2', '.dng', '.sr2')}
+_DT_DISPATCH.update({e: get_video_datetime for e in (
+    '.mp4', '.mov', '.avi', '.mkv', '.mts', '.m2ts')})
+
 def get_file_datetime(filepath: Path) -> datetime:
     try:
         stat = filepath.stat()
@@ -496,17 +841,181 @@ def get_file_datetime(filepath: Path) -> datetime:
 
 # ------------------ Duplicate detection & robust move ------------------
 
-def file_md5(path: Path, block_size: int = 65536) -> str:
-    h = hashlib.md5()
+# Reusable read buffers for the hash/copy fallback loops. LIFO so the most
+# recently used (cache-warm) buffer is handed out first; capped so an idle
+# pool never pins more than 2x the worker count in multi-MB buffers. A
+# pooled buffer smaller than the caller needs is simply dropped and a new
+# one allocated, so the pool converges on the largest requested size.
+_BUF_POOL: "queue.LifoQueue[bytearray]" = queue.LifoQueue()
+
+def _acquire_buf(size: int) -> bytearray:
+    try:
+        buf = _BUF_POOL.get_nowait()
+    except queue.Empty:
+        return bytearray(size)
+    return buf if len(buf) >= size else bytearray(size)
+
+def _release_buf(buf: bytearray):
+    if _BUF_POOL.qsize() < MAX_WORKERS * 2:
+        _BUF_POOL.put(buf)
+
+def _new_digest():
+    if blake3 is not None:
+        return blake3.blake3(max_threads=blake3.blake3.AUTO)
+    return hashlib.sha256()
+
+# Persistent digest cache next to PHOTOS_ROOT: repeat scans over an already
+# sorted library skip rehashing entirely. Created lazily because PHOTOS_ROOT
+# is only final after main() parses args.
+_DIGEST_DB_LOCK = threading.Lock()
+_DIGEST_DB = None
+
+def _digest_db():
+    global _DIGEST_DB
+    with _DIGEST_DB_LOCK:
+        if _DIGEST_DB is None:
+            try:
+                import sqlite3
+                db_path = PHOTOS_ROOT / ".sorter_digests.sqlite3"
+                conn = sqlite3.connect(str(db_path), check_same_thread=False)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS digests ("
+                    "path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, digest TEXT)")
+                conn.commit()
+                _DIGEST_DB = conn
+            except Exception as e:
+                log(f"Digest cache unavailable: {e}", "DEBUG")
+                _DIGEST_DB = False
+        return _DIGEST_DB or None
+
+def _digest_cached(path: Path, st) -> Optional[str]:
+    conn = _digest_db()
+    if conn is None:
+        return None
+    try:
+        with _DIGEST_DB_LOCK:
+            row = conn.execute(
+                "SELECT digest FROM digests WHERE path=? AND mtime_ns=? AND size=?",
+                (str(path), st.st_mtime_ns, st.st_size)).fetchone()
+        return row[0] if row else None
+    except Exception as e:
+        log(f"Digest cache read failed for {path}: {e}", "DEBUG")
+        return None
+
+def _digest_store(path: Path, st, digest: str):
+    conn = _digest_db()
+    if conn is None:
+        return
     try:
-        with open(path, 'rb') as f:
-            for chunk in iter(lambda: f.read(block_size), b''):
-                h.update(chunk)
+        with _DIGEST_DB_LOCK:
+            conn.execute(
+                "INSERT OR REPLACE INTO digests VALUES (?,?,?,?)",
+                (str(path), st.st_mtime_ns, st.st_size, digest))
+            conn.commit()
     except Exception as e:
-        log(f"Error while computing md5 for {path}: {e}", "DEBUG")
+        log(f"Digest cache write failed for {path}: {e}", "DEBUG")
+
+def file_digest(path: Path, block_size: int = 1024 * 1024, drop_cache: bool = False) -> str:
+    """
+    Dedup digest of a file (BLAKE3 when installed, SHA-256 otherwise).
+    drop_cache tells the kernel we won't re-read this file, so hashing a
+    large library doesn't evict pages the copy stage still wants.
+    """
+    try:
+        st = path.stat()
+        cached = _digest_cached(path, st)
+        if cached:
+            return cached
+        h = _new_digest()
+        # buffering=0: mmap and readinto consume the fd directly, so the
+        # default 8 KB BufferedReader layer would only add a copy.
+        with open(path, 'rb', buffering=0) as f:
+            hashed = False
+            # mmap lets the hasher's C code walk the page cache directly:
+            # no per-chunk bytes allocation, one update call for the whole
+            # file. Gated by size so a corrupt multi-TB sparse file can't
+            # exhaust address space; empty files can't be mapped at all.
+            if 0 < st.st_size < 2 ** 40:
+                try:
+                    import mmap
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        if hasattr(mm, 'madvise'):
+                            mm.madvise(mmap.MADV_SEQUENTIAL)
+                        h.update(memoryview(mm))
+                    hashed = True
+                except Exception as e:
+                    log(f"mmap hashing failed for {path}, using buffered read: {e}", "DEBUG")
+            if not hashed:
+                # Fallback (Windows, empty files, exotic filesystems).
+                # hashlib.file_digest (3.11+) runs the read/update loop in C;
+                # otherwise one reused buffer instead of a fresh bytes per chunk.
+                if hasattr(hashlib, 'file_digest'):
+                    try:
+                        h = hashlib.file_digest(f, _new_digest)
+                        hashed = True
+                    except Exception as e:
+                        log(f"hashlib.file_digest failed for {path}: {e}", "DEBUG")
+                        f.seek(0)
+                        h = _new_digest()
+            if not hashed:
+                buf = _acquire_buf(block_size)
+                try:
+                    mv = memoryview(buf)
+                    while True:
+                        n = f.readinto(buf)
+                        if not n:
+                            break
+                        h.update(mv[:n])
+                finally:
+                    _release_buf(buf)
+            if drop_cache and hasattr(os, 'posix_fadvise'):
+                try:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+                except Exception:
+                    pass
+    except Exception as e:
+        log(f"Error while computing digest for {path}: {e}", "DEBUG")
         return ''
+    digest = h.hexdigest()
+    _digest_store(path, st, digest)
+    return digest
+
+# Cheap pre-filter for duplicate checks: most same-name-same-size collisions
+# differ within the first or last few KB, so compare a digest of just those
+# regions before paying for a full-file hash.
+_SAMPLE_BYTES = 65536
+
+@functools.lru_cache(maxsize=4096)
+def _sample_fingerprint_cached(path_str: str, mtime_ns: int, size: int) -> str:
+    h = _new_digest()
+    try:
+        with open(path_str, 'rb') as f:
+            h.update(f.read(_SAMPLE_BYTES))
+            if size > _SAMPLE_BYTES:
+                f.seek(max(0, size - _SAMPLE_BYTES))
+                h.update(f.read(_SAMPLE_BYTES))
+    except Exception as e:
+        log(f"Cannot sample fingerprint for {path_str}: {e}", "DEBUG")
+        return ''
+    h.update(str(size).encode('ascii'))
     return h.hexdigest()
 
+def _sample_fingerprint(path: Path) -> str:
+    try:
+        st = path.stat()
+    except Exception as e:
+        log(f"Cannot stat for fingerprint {path}: {e}", "DEBUG")
+        return ''
+    # Keyed by (path, mtime_ns, size) so a rewritten file gets a fresh entry.
+    return _sample_fingerprint_cached(str(path), st.st_mtime_ns, st.st_size)
+
+# Full-file digests are CPU-bound and contend on the GIL past the core
+# count, unlike the I/O-bound metadata/copy work, so they get their own
+# capped pool: however many workers hit duplicate confirmation at once,
+# at most this many hash loops run.
+_HASH_POOL = ThreadPoolExecutor(max_workers=min(os.cpu_count() or 4, 8),
+                                thread_name_prefix="hash")
+
 def is_duplicate(filepath: Path, dest_dir: Path) -> bool:
     try:
         if not dest_dir.exists():
@@ -516,9 +1025,19 @@ def is_duplicate(filepath: Path, dest_dir: Path) -> bool:
             try:
                 if filepath.stat().st_size != dest_file.stat().st_size:
                     return False
+                fp1 = _sample_fingerprint(filepath)
+                fp2 = _sample_fingerprint(dest_file)
+                if not fp1 or not fp2 or fp1 != fp2:
+                    return False
                 if CHECKSUM_ON_DUP:
-                    md1 = file_md5(filepath)
-                    md2 = file_md5(dest_file)
+                    # Hash source and candidate concurrently on the hash pool.
+                    # The already-sorted candidate won't be read again, so
+                    # its pages are released; the source may still be copied
+                    # if the digests differ, so its cache is kept.
+                    fut1 = _HASH_POOL.submit(file_digest, filepath)
+                    fut2 = _HASH_POOL.submit(file_digest, dest_file, drop_cache=True)
+                    md1 = fut1.result()
+                    md2 = fut2.result()
                     if md1 and md2 and md1 == md2:
                         return True
                     return False
@@ -555,22 +1074,164 @@ def retry_op(fn, attempts=6, base_delay=0.5, max_delay=5.0, retry_on=(Permission
             delay *= 2
     return False, RuntimeError("Retry loop ended unexpectedly")
 
-def copy_with_retries(src: Path, dst: Path, attempts: int = RETRY_ATTEMPTS, buffer_size: int = COPY_BUFFER_SIZE):
-    def _copy():
+def _copy_file_range(fsrc, fdst, total: int) -> bool:
+    """
+    In-kernel copy via os.copy_file_range (Linux 4.5+). On reflink-capable
+    filesystems (btrfs, XFS) this clones extents instead of moving bytes.
+    Returns False when unsupported so the caller can fall back.
+    """
+    if not hasattr(os, 'copy_file_range'):
+        return False
+    copied = 0
+    try:
+        while copied < total:
+            n = os.copy_file_range(fsrc.fileno(), fdst.fileno(),
+                                   min(total - copied, 1 << 30))
+            if n == 0:
+                break
+            copied += n
+    except OSError as e:
+        if copied == 0 and getattr(e, 'errno', None) in (
+                errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.ENOTSUP):
+            return False
+        raise
+    return copied >= total
+
+def _copy_sendfile(fsrc, fdst, total: int, name: str) -> bool:
+    """
+    In-kernel copy via os.sendfile (Linux): data goes disk->disk without
+    crossing into user space. Returns False when sendfile is unavailable or
+    unsupported for these files — including macOS, whose sendfile only
+    accepts socket destinations — so the caller can fall back.
+    """
+    if not hasattr(os, 'sendfile'):
+        return False
+    show_progress = total > 50 * 1024 * 1024
+    offset = 0
+    try:
+        while offset < total:
+            sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, min(total - offset, 1 << 30))
+            if sent == 0:
+                break
+            offset += sent
+            if show_progress:
+                pct = (offset / total)
+                log(f"Copy progress {name}: {offset}/{total} bytes ({pct:.1%})", "DEBUG", dont_repeat_stats=True)
+    except OSError as e:
+        # EINVAL/ENOSYS/ENOTSUP: this filesystem can't sendfile. ENOTSOCK:
+        # macOS sendfile is file->socket only, so a file destination always
+        # lands here. Either way, use the buffered fallback.
+        if offset == 0 and getattr(e, 'errno', None) in (
+                errno.EINVAL, errno.ENOSYS, errno.ENOTSUP, errno.ENOTSOCK):
+            log(f"sendfile not supported for {name}, falling back to buffered copy", "DEBUG")
+            return False
+        raise
+    return offset >= total
+
+def _copy_win32(src: Path, dst: Path) -> bool:
+    """
+    Windows in-kernel copy via CopyFileExW (single DMA pass, no Python buffers).
+    Returns False when unavailable or when the API call fails so the caller
+    can fall back to the buffered loop.
+    """
+    if os.name != 'nt':
+        return False
+    try:
+        import ctypes
+        from ctypes import wintypes
         total = src.stat().st_size
         show_progress = total > 50 * 1024 * 1024
-        copied = 0
-        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
-            while True:
-                buf = fsrc.read(buffer_size)
-                if not buf:
-                    break
-                fdst.write(buf)
-                copied += len(buf)
-                if show_progress:
-                    pct = (copied / total)
-                    # Use dont_repeat_stats to avoid recursive log
-                    log(f"Copy progress {src.name}: {copied}/{total} bytes ({pct:.1%})", "DEBUG", dont_repeat_stats=True)
+
+        LPPROGRESS_ROUTINE = ctypes.WINFUNCTYPE(
+            wintypes.DWORD,
+            ctypes.c_longlong, ctypes.c_longlong,  # TotalFileSize, TotalBytesTransferred
+            ctypes.c_longlong, ctypes.c_longlong,  # StreamSize, StreamBytesTransferred
+            wintypes.DWORD, wintypes.DWORD,        # dwStreamNumber, dwCallbackReason
+            wintypes.HANDLE, wintypes.HANDLE, ctypes.c_void_p)
+
+        def _progress(total_size, transferred, *_args):
+            if show_progress and total_size:
+                pct = transferred / total_size
+                log(f"Copy progress {src.name}: {transferred}/{total_size} bytes ({pct:.1%})", "DEBUG", dont_repeat_stats=True)
+            return 0  # PROGRESS_CONTINUE
+
+        cancel = ctypes.c_int(0)
+        ok = ctypes.windll.kernel32.CopyFileExW(
+            str(src), str(dst), LPPROGRESS_ROUTINE(_progress), None,
+            ctypes.byref(cancel), 0)
+        if not ok:
+            log(f"CopyFileExW failed for {src.name} (winerror {ctypes.GetLastError()}), falling back", "DEBUG")
+        return bool(ok)
+    except Exception as e:
+        log(f"CopyFileExW unavailable for {src.name}: {e}", "DEBUG")
+        return False
+
+def copy_with_retries(src: Path, dst: Path, attempts: int = RETRY_ATTEMPTS, buffer_size: int = COPY_BUFFER_SIZE, fsrc=None):
+    # fsrc: optionally reuse a file object the caller already opened for
+    # metadata reads, saving another open() round-trip (noticeable on SMB/NFS).
+    def _copy():
+        total = src.stat().st_size
+
+        # Fast path 1: Windows kernel copy (CopyFileExW copies metadata too).
+        if _copy_win32(src, dst):
+            shutil.copystat(str(src), str(dst))
+            return True
+
+        if fsrc is not None:
+            fsrc.seek(0)
+            return _copy_from(fsrc, total)
+        with open(src, 'rb') as f:
+            return _copy_from(f, total)
+
+    def _copy_from(fsrc, total):
+        if hasattr(os, 'posix_fadvise'):
+            try:
+                os.posix_fadvise(fsrc.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except Exception:
+                pass
+        with open(dst, 'wb') as fdst:
+            # Fast path 2: io_uring batched read/write chains (optional, Linux).
+            if _uring is not None and _uring.AVAILABLE:
+                show_progress = total > 50 * 1024 * 1024
+
+                def _uring_progress(done, nbytes):
+                    if show_progress:
+                        log(f"Copy progress {src.name}: {done}/{nbytes} bytes ({done / nbytes:.1%})", "DEBUG", dont_repeat_stats=True)
+
+                if _uring.uring_copy(fsrc.fileno(), fdst.fileno(), total, _uring_progress):
+                    shutil.copystat(str(src), str(dst))
+                    return True
+
+            # Fast path 3: copy_file_range — in-kernel, and on btrfs/XFS a
+            # reflink clone that finishes in O(1) regardless of file size.
+            # EXDEV/ENOSYS (old kernels, incompatible filesystems) falls
+            # through to sendfile.
+            if _copy_file_range(fsrc, fdst, total):
+                shutil.copystat(str(src), str(dst))
+                return True
+
+            # Fast path 4: sendfile on Linux/macOS.
+            if not _copy_sendfile(fsrc, fdst, total, src.name):
+                # Fallback: user-space loop over one pooled buffer —
+                # readinto refills it in place, and the buffer goes back to
+                # _BUF_POOL for the next copy instead of being reallocated.
+                show_progress = total > 50 * 1024 * 1024
+                buf = _acquire_buf(buffer_size)
+                try:
+                    mv = memoryview(buf)
+                    copied = 0
+                    while True:
+                        n = fsrc.readinto(buf)
+                        if not n:
+                            break
+                        fdst.write(mv[:n])
+                        copied += n
+                        if show_progress:
+                            pct = (copied / total)
+                            # Use dont_repeat_stats to avoid recursive log
+                            log(f"Copy progress {src.name}: {copied}/{total} bytes ({pct:.1%})", "DEBUG", dont_repeat_stats=True)
+                finally:
+                    _release_buf(buf)
         shutil.copystat(str(src), str(dst))
         return True
 
@@ -618,12 +1279,98 @@ def unlink_with_retries(path: Path, attempts: int = RETRY_ATTEMPTS):
         log(f"Cannot handle locked file {path}: {e}", "ERROR")
         return False
 
-def atomic_move(src: Path, dst: Path, dry_run: bool = False) -> bool:
-    dst.parent.mkdir(parents=True, exist_ok=True)
+def trash_duplicate(filepath: Path) -> bool:
+    """Move a confirmed duplicate into the watch-dir trash via rename."""
+    trash_dir = WATCH_DIR / TRASH_DIR_NAME
+
+    def _trash():
+        trash_dir.mkdir(parents=True, exist_ok=True)
+        os.rename(str(filepath), str(trash_dir / f"{int(time.time())}_{filepath.name}"))
+        return True
+
+    ok, res = retry_op(_trash, attempts=RETRY_ATTEMPTS)
+    if not ok:
+        log(f"Cannot trash duplicate {filepath}: {res}", "WARN")
+        return False
+    return True
+
+def purge_trash_older_than(days: int = TRASH_MAX_AGE_DAYS):
+    trash_dir = WATCH_DIR / TRASH_DIR_NAME
+    if not trash_dir.exists():
+        return
+    cutoff = time.time() - days * 86400
+    removed = 0
+    try:
+        with os.scandir(trash_dir) as it:
+            for entry in it:
+                try:
+                    if entry.is_file(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                        removed += 1
+                except Exception as e:
+                    log(f"Cannot purge trashed duplicate {entry.path}: {e}", "DEBUG")
+    except Exception as e:
+        log(f"Cannot purge duplicate trash {trash_dir}: {e}", "DEBUG")
+    if removed:
+        log(f"Purged {removed} trashed duplicates older than {days} days", "INFO")
+
+# Destination buckets repeat heavily (most files in a batch share a
+# year/month/day), so remember which directories we've already created and
+# skip the mkdir syscall. Lock-free gate via dict.setdefault; a racing
+# double-mkdir is harmless with exist_ok=True. Nothing in the sorter removes
+# directories under PHOTOS_ROOT, so entries never go stale.
+_KNOWN_DIRS: Dict[str, bool] = {}
+
+def _ensure_dir(dest_dir: Path):
+    key = str(dest_dir)
+    if key not in _KNOWN_DIRS:
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        _KNOWN_DIRS[key] = True
+
+@functools.lru_cache(maxsize=4096)
+def _dest_bucket(ymd: str) -> Path:
+    """Existing year/month/day directory for a single strftime("%Y/%m/%d")."""
+    p = PHOTOS_ROOT / ymd
+    _ensure_dir(p)
+    return p
+
+def atomic_move(src: Path, dst: Path, dry_run: bool = False, fsrc=None) -> bool:
+    # When fsrc is given, atomic_move owns it: it serves as the copy source
+    # and is closed before the source unlink (Windows can't delete a file
+    # that still has an open handle).
+    _ensure_dir(dst.parent)
     if dry_run:
+        if fsrc is not None:
+            fsrc.close()
         log(f"[dry-run] would move {src} -> {dst}", "INFO")
         return True
 
+    # Same-volume fast path: one rename replaces copy+replace+unlink, so a
+    # 10 GB video moves in milliseconds. dst is already unique (caller went
+    # through create_unique_filename). Cross-device renames fail with EXDEV
+    # and drop into the copy path below.
+    try:
+        same_dev = src.stat().st_dev == dst.parent.stat().st_dev
+    except Exception:
+        same_dev = False
+    if same_dev:
+        if fsrc is not None:
+            # Windows can't rename a file whose handle lacks DELETE sharing.
+            try:
+                fsrc.close()
+            except Exception:
+                pass
+            fsrc = None
+
+        def _rename():
+            os.rename(str(src), str(dst))
+            return True
+
+        ok, res = retry_op(_rename, attempts=RETRY_ATTEMPTS)
+        if ok:
+            return True
+        log(f"atomic_move: rename fast path failed for {src} -> {dst}: {res}", "DEBUG")
+
     pid = os.getpid()
     ts = int(time.time() * 1000)
     tmp = dst.with_name(f"{dst.stem}.{pid}.{ts}.tmp{dst.suffix}")
@@ -637,7 +1384,14 @@ def atomic_move(src: Path, dst: Path, dry_run: bool = False) -> bool:
     except Exception:
         pass
 
-    ok = copy_with_retries(src, tmp, attempts=RETRY_ATTEMPTS, buffer_size=COPY_BUFFER_SIZE)
+    try:
+        ok = copy_with_retries(src, tmp, attempts=RETRY_ATTEMPTS, buffer_size=COPY_BUFFER_SIZE, fsrc=fsrc)
+    finally:
+        if fsrc is not None:
+            try:
+                fsrc.close()
+            except Exception:
+                pass
     if not ok:
         log(f"atomic_move: initial copy failed for {src}", "ERROR")
         return False
@@ -653,30 +1407,27 @@ def atomic_move(src: Path, dst: Path, dry_run: bool = False) -> bool:
 
 # ------------------ Main sorting logic ------------------
 
+# hidden on Windows; cached because the attribute crosses into the kernel
+# and the same paths get re-checked during scan + cleanup passes.
+@functools.lru_cache(maxsize=4096)
+def _win_hidden(path_str: str) -> bool:
+    try:
+        attrs = _GetFileAttributesW(path_str)
+        # INVALID_FILE_ATTRIBUTES == 0xFFFFFFFF with an unsigned restype.
+        return attrs != 0xFFFFFFFF and bool(attrs & 0x2)
+    except Exception:
+        return False
+
 def should_ignore(path: Path) -> bool:
+    # No existence precheck: callers get paths from directory enumeration or
+    # watch events, and anything that vanished since fails naturally at the
+    # open/stat that follows.
     try:
-        if not path.exists():
-            return True
-        if path.suffix.lower() in IGNORE_EXT:
+        if _IGNORE_RE.search(str(path)):
             return True
-        if path.name.startswith(IGNORE_PREFIXES):
+        # Hidden-attribute files can't be told apart by name.
+        if os.name == 'nt' and _win_hidden(str(path)):
             return True
-        for part in path.parts:
-            if part.lower() in IGNORE_DIRS:
-                return True
-        # hidden on Windows
-        if os.name == 'nt':
-            try:
-                import ctypes
-                FILE_ATTRIBUTE_HIDDEN = 0x2
-                attrs = ctypes.windll.kernel32.GetFileAttributesW(str(path))
-                if attrs != -1 and (attrs & FILE_ATTRIBUTE_HIDDEN):
-                    return True
-            except Exception:
-                pass
-        else:
-            if path.name.startswith('.'):
-                return True
     except Exception as e:
         log(f"Error in should_ignore for {path}: {e}", "DEBUG")
     return False
@@ -702,84 +1453,139 @@ def create_unique_filename(dest_dir: Path, filename: str) -> Path:
         if counter > 100:
             return dest_dir / f"{stem}_{int(time.time())}{suffix}"
 
-def sort_file(filepath: Path):
+# A resolved move ready for the copy stage: metadata and destination are
+# final, the processing guard for file_key is still held, and fsrc (when not
+# None) is the open handle that _execute_move hands to atomic_move.
+PreparedMove = namedtuple("PreparedMove", "filepath dest_file fsrc file_key bucket emoji")
+
+def _release_guard(file_key: str, b: int):
+    _INFLIGHT.pop(file_key, None)
+
+def _resolve_move(filepath: Path) -> Optional[PreparedMove]:
+    """Stage 1: dedup guard, stability wait, metadata read, duplicate check."""
     filepath = filepath.resolve()
     file_key = str(filepath)
 
     if should_ignore(filepath):
-        return
+        return None
 
     ext = filepath.suffix.lower()
     if ext not in ALLOWED_EXT:
         log(f"Skipping unsupported file type: {filepath.name} ({ext})", "DEBUG")
-        return
+        return None
 
-    with LOCK:
-        if file_key in PROCESSING_FILES:
-            log(f"File already queued: {filepath}", "DEBUG")
-            return
-        current_time = time.time()
-        if file_key in FILE_HISTORY and (current_time - FILE_HISTORY[file_key] < 300):
-            return
-        PROCESSING_FILES.add(file_key)
-        FILE_HISTORY[file_key] = current_time
-        if len(FILE_HISTORY) > MAX_PROCESSING_HISTORY:
-            oldest_keys = sorted(FILE_HISTORY.items(), key=lambda x: x[1])[:100]
-            for key, _ in oldest_keys:
-                FILE_HISTORY.pop(key, None)
+    # Claim the key lock-free: setdefault either installs our timestamp or
+    # returns the one a racing worker installed first.
+    current_time = time.time()
+    if _INFLIGHT.setdefault(file_key, current_time) is not current_time:
+        log(f"File already queued: {filepath}", "DEBUG")
+        return None
+
+    b = _bucket(file_key)
+    with _Shards.locks[b]:
+        hist = _Shards.hist[b]
+        if file_key in hist and (current_time - hist[file_key] < 300):
+            _INFLIGHT.pop(file_key, None)
+            return None
+        hist[file_key] = current_time
+        hist.move_to_end(file_key)
+        while len(hist) > MAX_PROCESSING_HISTORY // _SHARD_COUNT:
+            hist.popitem(last=False)
 
     file_emoji = LogArt.get_file_emoji(ext)
     STATS.add_processed(ext)
+    fsrc = None
+    handed_off = False
 
     try:
         log_file_processing(filepath.name, file_emoji)
 
         for attempt in range(MAX_TRIES):
             if STOP_EVENT.is_set():
-                return
+                return None
+            if not filepath.exists():
+                log(f"File vanished before processing: {filepath.name}", "DEBUG")
+                return None
             if is_file_stable(filepath):
                 break
             time.sleep(1)
         else:
             log(f"File not stable after {MAX_TRIES} attempts: {filepath.name}", "WARN")
             STATS.add_error()
-            return
+            return None
+
+        # One open() serves both the metadata read and the copy source below,
+        # instead of every stage reopening the file by path.
+        try:
+            fsrc = open(filepath, 'rb')
+        except Exception as e:
+            log(f"Cannot open {filepath} for processing: {e}", "DEBUG")
+            fsrc = None
 
-        dt = None
-        if ext in {'.jpg', '.jpeg', '.png', '.webp', '.heic', '.heif', '.gif', '.bmp', '.tiff'}:
-            dt = get_exif_datetime(filepath)
-        elif ext in {'.cr2', '.cr3', '.nef', '.arw', '.raf', '.orf', '.rw2', '.dng', '.sr2'}:
-            dt = get_raw_datetime(filepath)
-        elif ext in {'.mp4', '.mov', '.avi', '.mkv', '.mts', '.m2ts'}:
-            dt = get_video_datetime(filepath)
+        extractor = _DT_DISPATCH.get(ext)
+        dt = extractor(filepath, fsrc) if extractor is not None else None
 
         if not dt:
             dt = get_file_datetime(filepath)
             log(f"Using file date for {filepath.name}: {dt}", "INFO")
 
-        year = dt.strftime("%Y")
-        month = dt.strftime("%m")
-        day = dt.strftime("%d")
-
-        dest_dir = PHOTOS_ROOT / year / month / day
-        dest_dir.mkdir(parents=True, exist_ok=True)
+        # One strftime and one cached Path per bucket instead of three of
+        # each; files taken the same day hit the lru_cache.
+        dest_dir = _dest_bucket(dt.strftime("%Y/%m/%d"))
 
         # Duplicate detection
         if is_duplicate(filepath, dest_dir):
             log_duplicate_found(filepath.name)
             STATS.add_skipped()
+            # Drop our handle before renaming/unlinking the source: Windows
+            # refuses both with a sharing violation while it is open, and
+            # nothing below needs it (is_duplicate reopens by path).
+            if fsrc is not None:
+                try:
+                    fsrc.close()
+                except Exception:
+                    pass
+                fsrc = None
             if not DRY_RUN:
-                if not unlink_with_retries(filepath):
+                if DUP_MODE == "trash":
+                    if not trash_duplicate(filepath):
+                        log(f"Could not trash duplicate source: {filepath}", "WARN")
+                elif not unlink_with_retries(filepath):
                     log(f"Could not remove duplicate source: {filepath}", "WARN")
-            clean_empty_dirs(filepath.parent)
-            return
+            _mark_dirty(filepath.parent)
+            return None
 
         dest_file = create_unique_filename(dest_dir, filepath.name)
+        pm = PreparedMove(filepath, dest_file, fsrc, file_key, b, file_emoji)
+        handed_off = True
+        return pm
+    except Exception as e:
+        log_error(filepath.name, str(e))
+        STATS.add_error()
+        import traceback
+        log(f"Traceback: {traceback.format_exc()}", "DEBUG")
+        return None
+    finally:
+        if not handed_off:
+            if fsrc is not None:
+                try:
+                    fsrc.close()
+                except Exception:
+                    pass
+            _release_guard(file_key, b)
 
-        moved = atomic_move(filepath, dest_file, dry_run=DRY_RUN)
+def _execute_move(pm: PreparedMove):
+    """Stage 2: data movement; releases the processing guard when done."""
+    filepath = pm.filepath
+    dest_file = pm.dest_file
+    fsrc = pm.fsrc
+    try:
+        # atomic_move takes ownership of fsrc and closes it before the unlink.
+        moved = atomic_move(filepath, dest_file, dry_run=DRY_RUN, fsrc=fsrc)
+        fsrc = None
         if moved:
             STATS.add_moved()
-            log_file_moved(str(filepath), str(dest_file), file_emoji)
+            log_file_moved(str(filepath), str(dest_file), pm.emoji)
         else:
             # fallback: try copy_with_retries + unlink_with_retries
             log(f"Atomic move failed for {filepath.name}, trying fallback copy", "WARN")
@@ -789,44 +1595,102 @@ def sort_file(filepath: Path):
                     if not unlink_with_retries(filepath):
                         log(f"Copied but could not delete source {filepath}", "WARN")
                 STATS.add_moved()
-                log_file_moved(str(filepath), str(dest_file), file_emoji)
+                log_file_moved(str(filepath), str(dest_file), pm.emoji)
             else:
                 log_error(filepath.name, "Both atomic_move and fallback copy failed")
                 STATS.add_error()
 
-        clean_empty_dirs(filepath.parent)
+        _mark_dirty(filepath.parent)
     except Exception as e:
         log_error(filepath.name, str(e))
         STATS.add_error()
         import traceback
         log(f"Traceback: {traceback.format_exc()}", "DEBUG")
     finally:
-        with LOCK:
-            PROCESSING_FILES.discard(file_key)
-
-def clean_empty_dirs(start_dir: Path):
-    try:
-        if not start_dir.exists() or start_dir == WATCH_DIR or not start_dir.is_dir():
-            return
-        for item in list(start_dir.iterdir()):
-            if item.is_dir() and not should_ignore(item):
-                clean_empty_dirs(item)
-        if start_dir.exists() and start_dir.is_dir():
+        if fsrc is not None:
             try:
-                items = list(start_dir.iterdir())
-                if not items:
-                    start_dir.rmdir()
-                    log(f"Removed empty directory: {start_dir}", "INFO")
-            except (OSError, PermissionError):
+                fsrc.close()
+            except Exception:
                 pass
+        _release_guard(pm.file_key, pm.bucket)
+
+def sort_file(filepath: Path):
+    """Synchronous resolve + execute; used by the initial scan."""
+    pm = _resolve_move(filepath)
+    if pm is not None:
+        _execute_move(pm)
+
+# Metadata stage pool for the live watcher: while one big video is being
+# copied (bandwidth-bound), EXIF/probe work for the files behind it keeps
+# running here instead of queueing on the copy workers.
+_META_POOL = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 4),
+                                thread_name_prefix="meta")
+
+def schedule_sort(filepath: Path, copy_pool):
+    def _chain(fut):
+        try:
+            pm = fut.result()
+        except Exception as e:
+            log(f"Metadata stage failed for {filepath}: {e}", "ERROR")
+            return
+        if pm is not None:
+            copy_pool.submit(_execute_move, pm)
+
+    _META_POOL.submit(_resolve_move, filepath).add_done_callback(_chain)
+
+# Empty-directory cleanup is decoupled from the per-file hot path: workers
+# just record the parent chain of anything they moved, and a janitor thread
+# sweeps the set every 30 s. Sorting candidates longest-path-first makes the
+# sweep bottom-up — one rmdir syscall per candidate, no recursion, and the
+# failure mode for a non-empty dir is simply ENOTEMPTY.
+_DIRTY_DIRS: Set[str] = set()
+_DIRTY_LOCK = threading.Lock()
+_JANITOR_INTERVAL = 30.0
+
+def _mark_dirty(start_dir: Path):
+    try:
+        root = str(WATCH_DIR.resolve())
+        d = start_dir
+        with _DIRTY_LOCK:
+            while str(d) != root and str(d).startswith(root + os.sep):
+                _DIRTY_DIRS.add(str(d))
+                d = d.parent
     except Exception as e:
-        log(f"Cannot clean directories {start_dir}: {e}", "DEBUG")
+        log(f"Cannot record dir for cleanup {start_dir}: {e}", "DEBUG")
+
+def _sweep_dirty_dirs():
+    with _DIRTY_LOCK:
+        candidates = sorted(_DIRTY_DIRS, key=len, reverse=True)
+        _DIRTY_DIRS.clear()
+    for d in candidates:
+        try:
+            os.rmdir(d)
+            log(f"Removed empty directory: {d}", "INFO")
+        except OSError:
+            pass
+
+def _janitor():
+    while not STOP_EVENT.wait(_JANITOR_INTERVAL):
+        try:
+            _sweep_dirty_dirs()
+        except Exception as e:
+            log(f"Cleanup sweep failed: {e}", "DEBUG")
+    _sweep_dirty_dirs()
 
 # ------------------ Watchdog handler & initial scan ------------------
 
 class SortingHandler(FileSystemEventHandler):
     def __init__(self, executor):
         self.executor = executor
+        # Debounce state: path -> due time on the monotonic clock. Events
+        # are recorded in O(1) and released WAIT_SEC later by one scheduler
+        # thread, so the watchdog dispatch thread never sleeps and repeated
+        # events on the same path within the window coalesce into one job.
+        self._pending = {}
+        self._heap = []
+        self._cv = threading.Condition()
+        threading.Thread(target=self._scheduler, daemon=True,
+                         name="debounce").start()
 
     def on_created(self, event):
         if not event.is_directory:
@@ -840,37 +1704,134 @@ class SortingHandler(FileSystemEventHandler):
             except Exception:
                 self._schedule_sorting(Path(event.src_path))
 
+    def on_closed(self, event):
+        # inotify IN_CLOSE_WRITE: the writer is done; lets is_file_stable
+        # skip its polling loop for this file.
+        if not event.is_directory:
+            try:
+                _signal_closed(str(Path(event.src_path).resolve()))
+            except Exception:
+                pass
+
     def _schedule_sorting(self, filepath: Path):
         if not filepath.is_file() or should_ignore(filepath):
             return
-        time.sleep(WAIT_SEC)
+        due = time.monotonic() + WAIT_SEC
+        with self._cv:
+            self._pending[str(filepath)] = due
+            heapq.heappush(self._heap, (due, str(filepath)))
+            self._cv.notify()
+
+    def _scheduler(self):
+        while not STOP_EVENT.is_set():
+            with self._cv:
+                if not self._heap:
+                    self._cv.wait(timeout=1.0)
+                    continue
+                due, key = self._heap[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._cv.wait(timeout=delay)
+                    continue
+                heapq.heappop(self._heap)
+                # Stale entry: a newer event pushed this path's deadline out.
+                if self._pending.get(key) != due:
+                    continue
+                del self._pending[key]
+            if not STOP_EVENT.is_set():
+                schedule_sort(Path(key), self.executor)
+
+# Polling-observer stat sweep interval when the watch dir is on a network
+# filesystem (inotify/FSEvents don't see remote writes there).
+WATCH_POLL_INTERVAL = 30.0
+_NETWORK_FS = frozenset({'nfs', 'nfs4', 'cifs', 'smbfs', 'smb3',
+                         'sshfs', 'fuse.sshfs', '9p', 'afs', 'ncpfs'})
+
+def _is_network_mount(path: Path) -> bool:
+    """Longest-prefix match of path against /proc/mounts fs types."""
+    try:
+        target = str(path.resolve())
+        best_mnt, best_type = '', ''
+        with open('/proc/mounts') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 3:
+                    continue
+                mnt, fstype = parts[1], parts[2]
+                if (target == mnt or mnt == '/'
+                        or target.startswith(mnt.rstrip('/') + '/')):
+                    if len(mnt) > len(best_mnt):
+                        best_mnt, best_type = mnt, fstype
+        return best_type in _NETWORK_FS
+    except Exception:
+        return False
+
+def _make_observer():
+    # watchdog's native backends (inotify/ReadDirectoryChangesW/FSEvents)
+    # cost nothing at idle, but they can't see writes arriving on a network
+    # mount from other clients — those need a stat sweep, just a slow one
+    # instead of the default every-second scan of the whole tree.
+    if _is_network_mount(WATCH_DIR):
+        from watchdog.observers.polling import PollingObserver
+        log(f"Network filesystem under {WATCH_DIR}; polling every {WATCH_POLL_INTERVAL:.0f}s", "INFO")
+        return PollingObserver(timeout=WATCH_POLL_INTERVAL)
+    return Observer()
+
+_SCAN_BATCH = 8
+
+def _sort_batch(batch):
+    for fp in batch:
         if STOP_EVENT.is_set():
             return
-        self.executor.submit(sort_file, filepath)
+        try:
+            sort_file(fp)
+        except Exception as e:
+            log_error(fp.name, str(e))
 
 def initial_scan():
     log(f"Starting initial scan of {WATCH_DIR}", "INFO")
+    # Explicit scandir walk instead of rglob: DirEntry answers is_file/is_dir
+    # from the readdir data (no extra stat), ignored subtrees are pruned by
+    # entry name before descending, and Path objects are built only for the
+    # files that survive the filter.
     file_list = []
-    for filepath in WATCH_DIR.rglob("*"):
-        if STOP_EVENT.is_set():
-            break
-        if not filepath.is_file() or should_ignore(filepath):
-            continue
-        file_list.append(filepath)
+    stack = deque([str(WATCH_DIR)])
+    while stack and not STOP_EVENT.is_set():
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name.lower() not in IGNORE_DIRS:
+                            stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        p = Path(entry.path)
+                        if not should_ignore(p):
+                            file_list.append(p)
+        except OSError as e:
+            log(f"Cannot scan directory {d}: {e}", "WARN")
 
     log_file_discovery(len(file_list))
 
     if file_list:
         log(f"Starting processing {len(file_list)} files...", "INFO")
+        # Submit in batches of _SCAN_BATCH: on 100k-file scans one future per
+        # file spends more time in executor bookkeeping than in actual work.
+        # Each batch still hashes/moves its files one by one, but MAX_WORKERS
+        # batches run concurrently, which keeps every core fed (blake3 adds
+        # its own SIMD lanes per file on top when installed).
+        batches = [file_list[i:i + _SCAN_BATCH]
+                   for i in range(0, len(file_list), _SCAN_BATCH)]
+        done = 0
         with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = {executor.submit(sort_file, fp): fp for fp in file_list}
-            for i, future in enumerate(as_completed(futures), 1):
+            futures = {executor.submit(_sort_batch, b): b for b in batches}
+            for future in as_completed(futures):
                 try:
                     future.result()
-                    log_progress(i, len(file_list))
                 except Exception as e:
-                    filepath = futures[future]
-                    log_error(filepath.name, str(e))
+                    log(f"Scan batch failed: {e}", "ERROR")
+                done += len(futures[future])
+                log_progress(min(done, len(file_list)), len(file_list))
     log("Initial scan completed", "SUCCESS")
     print()
 
@@ -881,23 +1842,21 @@ def signal_handler(signum, frame):
     STOP_EVENT.set()
 
 def check_dependencies():
-    try:
-        import watchdog  # noqa: F401
-        import piexif   # noqa: F401
-        import exifread # noqa: F401
-        import ffmpeg   # noqa: F401
-        from PIL import Image  # noqa: F401
-        log("All main dependencies available", "SUCCESS")
-        try:
-            import pillow_heif  # noqa: F401
-            log("pillow-heif available (HEIC support)", "INFO")
-        except ImportError:
-            log("pillow-heif not installed (optional)", "WARN")
-        return True
-    except ImportError as e:
-        log(f"Missing dependency: {e}", "ERROR")
+    # Imports already happened (guarded) at module load; here we only report.
+    missing = [name for name, mod in
+               (("piexif", piexif), ("exifread", exifread),
+                ("ffmpeg-python", ffmpeg), ("Pillow", Image))
+               if mod is None]
+    if missing:
+        log(f"Missing dependency: {', '.join(missing)}", "ERROR")
         log("Install: pip install watchdog piexif exifread ffmpeg-python Pillow pillow-heif", "INFO")
         return False
+    log("All main dependencies available", "SUCCESS")
+    if pillow_heif is not None:
+        log("pillow-heif available (HEIC support)", "INFO")
+    else:
+        log("pillow-heif not installed (optional)", "WARN")
+    return True
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Copyparty Auto Sorter (styled & robust)")
@@ -906,20 +1865,25 @@ def parse_args():
     parser.add_argument("--log", type=str, default=str(DEFAULT_LOGFILE), help="Log file")
     parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Max worker threads")
     parser.add_argument("--dry-run", action="store_true", help="Do not modify files, just log actions")
-    parser.add_argument("--no-checksum-dups", action="store_true", help="Do not compute md5 to confirm duplicates")
+    parser.add_argument("--verbose", action="store_true", help="Also emit DEBUG log messages")
+    parser.add_argument("--no-checksum-dups", action="store_true", help="Do not compute checksums to confirm duplicates")
+    parser.add_argument("--dup-mode", choices=["delete", "trash"], default=DUP_MODE,
+                        help="What to do with duplicate sources: move to .duplicates (reversible) or delete")
     parser.add_argument("--buffer-size-mb", type=int, default=int(COPY_BUFFER_SIZE / (1024 * 1024)), help="Copy buffer size in MB")
     return parser.parse_args()
 
 def main():
-    global WATCH_DIR, PHOTOS_ROOT, LOGFILE, DRY_RUN, MAX_WORKERS, CHECKSUM_ON_DUP, COPY_BUFFER_SIZE
+    global WATCH_DIR, PHOTOS_ROOT, LOGFILE, DRY_RUN, VERBOSE, MAX_WORKERS, CHECKSUM_ON_DUP, COPY_BUFFER_SIZE, DUP_MODE
 
     args = parse_args()
     WATCH_DIR = Path(args.watch)
     PHOTOS_ROOT = Path(args.target)
     LOGFILE = Path(args.log)
     DRY_RUN = args.dry_run
+    VERBOSE = args.verbose
     MAX_WORKERS = args.workers
     CHECKSUM_ON_DUP = not args.no_checksum_dups
+    DUP_MODE = args.dup_mode
     COPY_BUFFER_SIZE = max(1024 * 1024, args.buffer_size_mb * 1024 * 1024)
 
     log_banner()
@@ -950,39 +1914,47 @@ def main():
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
+    purge_trash_older_than()
+
+    threading.Thread(target=_janitor, daemon=True, name="janitor").start()
+
     if not STOP_EVENT.is_set():
         initial_scan()
+        _sweep_dirty_dirs()
 
     if not STOP_EVENT.is_set():
         log(f"Starting filesystem observer on {WATCH_DIR}", "INFO")
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            event_handler = SortingHandler(executor)
-            observer = Observer()
-            try:
-                observer.schedule(event_handler, str(WATCH_DIR), recursive=True)
-                observer.start()
-                log("Observer started", "SUCCESS")
-            except Exception as e:
-                log(f"Cannot start observer: {e}", "ERROR")
-                return
+        # Work-stealing pool: each worker has its own deque, so bursty
+        # uploads don't serialize on one executor submission lock.
+        pool = _wsq.WSPool(MAX_WORKERS)
+        event_handler = SortingHandler(pool)
+        observer = _make_observer()
+        try:
+            observer.schedule(event_handler, str(WATCH_DIR), recursive=True)
+            observer.start()
+            log("Observer started", "SUCCESS")
+        except Exception as e:
+            log(f"Cannot start observer: {e}", "ERROR")
+            return
 
-            last_stats_time = time.time()
-            try:
-                while not STOP_EVENT.is_set():
-                    time.sleep(1)
-                    if time.time() - last_stats_time > 300:
-                        print()
-                        log(LogStyle.header("PERIODIC STATS"), "INFO")
-                        print(STATS.get_summary())
-                        print()
-                        last_stats_time = time.time()
-            except KeyboardInterrupt:
-                log("Keyboard interrupt received", "WARN")
-                STOP_EVENT.set()
-            except Exception as e:
-                log(f"Observer error: {e}", "ERROR")
-            observer.stop()
-            observer.join()
+        last_stats_time = time.time()
+        try:
+            while not STOP_EVENT.is_set():
+                time.sleep(1)
+                if time.time() - last_stats_time > 300:
+                    print()
+                    log(LogStyle.header("PERIODIC STATS"), "INFO")
+                    print(STATS.get_summary())
+                    print()
+                    last_stats_time = time.time()
+        except KeyboardInterrupt:
+            log("Keyboard interrupt received", "WARN")
+            STOP_EVENT.set()
+        except Exception as e:
+            log(f"Observer error: {e}", "ERROR")
+        observer.stop()
+        observer.join()
+        pool.shutdown()
 
     print()
     log(LogStyle.header("SHUTDOWN"), "INFO")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# _wsq.py
+# Small work-stealing thread pool for the sorter's live-watch phase.
+#
+# ThreadPoolExecutor funnels every submit through one internal lock and one
+# shared queue. Here each worker owns a local deque (LIFO for cache-warm
+# pops) and steals FIFO from a random sibling when its own runs dry, so
+# bursts of uploads spread across workers without a central hot spot.
+
+import os
+import random
+import threading
+from collections import deque
+
+
+class WSPool:
+    def __init__(self, workers: int = None):
+        self.n = workers or min(os.cpu_count() or 4, 8)
+        self.qs = [deque() for _ in range(self.n)]
+        self.locks = [threading.Lock() for _ in range(self.n)]
+        self.sem = threading.Semaphore(0)
+        self._stop = False
+        self.threads = [
+            threading.Thread(target=self._worker, args=(i,), daemon=True, name=f"wsq-{i}")
+            for i in range(self.n)
+        ]
+        for t in self.threads:
+            t.start()
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs); same call shape as executor.submit."""
+        i = threading.get_ident() % self.n
+        with self.locks[i]:
+            self.qs[i].append((fn, args, kwargs))
+        self.sem.release()
+
+    def _take(self, i):
+        with self.locks[i]:
+            if self.qs[i]:
+                return self.qs[i].pop()
+        victims = list(range(self.n))
+        random.shuffle(victims)
+        for j in victims:
+            if j == i:
+                continue
+            with self.locks[j]:
+                if self.qs[j]:
+                    return self.qs[j].popleft()
+        return None
+
+    def _worker(self, i: int):
+        while True:
+            self.sem.acquire()
+            task = self._take(i)
+            if task is not None:
+                fn, args, kwargs = task
+                try:
+                    fn(*args, **kwargs)
+                except Exception:
+                    # Tasks (sort_file) do their own logging; never kill a worker.
+                    pass
+                continue
+            # Only exit once stop is requested AND every deque is drained, so
+            # tasks queued before shutdown still run to completion.
+            if self._stop:
+                return
+
+    def shutdown(self):
+        """Finish everything already queued, then stop the workers.
+
+        Joins without a deadline on purpose: a worker abandoned mid-move
+        still holds an _INFLIGHT claim, an open source handle and a partial
+        .tmp file, and those only get cleaned up if the task is allowed to
+        finish.
+        """
+        self._stop = True
+        for _ in self.threads:
+            self.sem.release()  # one wake-up per worker even with empty deques
+        for t in self.threads:
+            t.join()